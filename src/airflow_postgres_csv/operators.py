@@ -1,19 +1,275 @@
 """Custom Airflow operators for PostgreSQL <-> CSV file transfers."""
 
 import gzip
+import io
+import mmap
 import os
+import shutil
+import subprocess
 from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
+from functools import lru_cache
 
 from airflow.exceptions import AirflowException
 from airflow.providers.postgres.hooks.postgres import PostgresHook
 from airflow.sdk.bases.operator import BaseOperator
+from psycopg2 import sql as psycopg2_sql
+
+# Buffer size for CSV file handles. COPY exchanges data in row-sized or 8 KiB pieces,
+# so a large buffer keeps syscalls and compressor calls few and large.
+_BUFFER_SIZE = 16 * 1024 * 1024
+
+# Uncompressed input files larger than this are memory-mapped instead of read.
+_MMAP_THRESHOLD = 4 * 1024 * 1024
+
+# Size of the blocks fed to psycopg 3's ``Copy.write``.
+_COPY_CHUNK_SIZE = 4 * 1024 * 1024
+
+_FORMATS = ("csv", "binary")
+
+# Characters stripped from the end of a query before it is wrapped in COPY (...).
+_SQL_TRAILERS = " \t\r\n\f\v;"
+
+
+def _which(name: str) -> str:
+    """Return the full path of an executable, raising if it is not on ``PATH``."""
+    path = shutil.which(name)
+    if path is None:
+        raise AirflowException(f"'{name}' executable not found on PATH")
+    return path
+
+
+@contextmanager
+def _connect(conn_id: str):
+    """
+    Yield a DB-API connection that is committed on success and rolled back on error.
+
+    The whole task runs in this one transaction, so there is a single commit at the
+    end and the connection is closed afterwards. The connection comes from
+    ``PostgresHook.get_conn``, so every extra of the Airflow connection (``sslmode``,
+    ``options``, keepalives, ...) and its current credentials apply.
+    """
+    conn = PostgresHook(postgres_conn_id=conn_id).get_conn()
+    try:
+        yield conn
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def _begin(cursor, timeout: int, *statements) -> None:
+    """
+    Run ``statements`` at the start of the task's transaction in one round trip.
+
+    ``SET LOCAL statement_timeout`` is prepended to the batch. It is not passed in the
+    connect ``options``, which would replace any set on the Airflow connection.
+    """
+    sql = _sql_module(cursor)
+    set_timeout = sql.SQL("SET LOCAL statement_timeout = {}").format(
+        sql.Literal(timeout * 60 * 1000)
+    )
+    cursor.execute(sql.SQL("; ").join((set_timeout, *statements)))
+
+
+def _sql_module(cursor):
+    """Return the ``sql`` composition module of the cursor's driver."""
+    if hasattr(cursor, "copy_expert"):
+        return psycopg2_sql
+    from psycopg import sql  # psycopg 3, only installed when the hook is set up for it
+
+    return sql
+
+
+def _mogrify(cursor, query: str, parameters) -> str:
+    """Return ``query`` with ``parameters`` bound client-side, using psycopg2 or psycopg 3."""
+    if hasattr(cursor, "copy_expert"):
+        return cursor.mogrify(query, parameters).decode("utf-8")
+    # Server-side binding cursors have no mogrify; a ClientCursor on the same connection does
+    from psycopg import ClientCursor
+
+    with ClientCursor(cursor.connection) as client_cursor:
+        return client_cursor.mogrify(query, parameters)
+
+
+@lru_cache(maxsize=32)
+def _copy_from_command(
+    sql,
+    table_name: str,
+    columns: tuple[str, ...],
+    file_format: str,
+    delimiter: str,
+    quote_char: str,
+    null_string: str,
+    header: bool,
+):
+    """
+    Compose a ``COPY ... FROM STDIN`` statement with properly quoted identifiers and options.
+
+    :param sql: The driver's ``sql`` module, see :func:`_sql_module`.
+    """
+    command = sql.SQL("COPY {} ").format(sql.Identifier(*table_name.split(".")))
+    if columns:
+        command += sql.SQL("({}) ").format(sql.SQL(", ").join(map(sql.Identifier, columns)))
+    if file_format == "binary":
+        return command + sql.SQL("FROM STDIN WITH (FORMAT BINARY)")
+    # The file is read as bytes, so its encoding is declared here rather than by a codec
+    options = sql.SQL("FORMAT CSV, DELIMITER {}, QUOTE {}, NULL {}, ENCODING 'UTF8'").format(
+        sql.Literal(delimiter), sql.Literal(quote_char), sql.Literal(null_string)
+    )
+    if header:
+        options += sql.SQL(", HEADER")
+    return command + sql.SQL("FROM STDIN WITH ({})").format(options)
+
+
+def _copy_to(cursor, command: str, file) -> None:
+    """Stream ``COPY ... TO STDOUT`` into ``file`` using psycopg2 or psycopg 3."""
+    if hasattr(cursor, "copy_expert"):
+        cursor.copy_expert(command, file)
+        return
+    with cursor.copy(command) as copy:
+        for data in copy:
+            file.write(data)
+
+
+def _copy_from(cursor, command: str, file) -> None:
+    """Stream ``file`` into ``COPY ... FROM STDIN`` using psycopg2 or psycopg 3."""
+    if hasattr(cursor, "copy_expert"):
+        cursor.copy_expert(command, file)
+        return
+    with cursor.copy(command) as copy:
+        while data := file.read(_COPY_CHUNK_SIZE):
+            copy.write(data)
+
+
+def _fadvise(fd: int, *advice: str) -> None:
+    """Apply ``os.POSIX_FADV_*`` hints to the whole file; a no-op where unsupported."""
+    if hasattr(os, "posix_fadvise"):
+        for name in advice:
+            os.posix_fadvise(fd, 0, 0, getattr(os, name))
+
+
+def _drop_page_cache(path: str) -> None:
+    """Flush a freshly written file to disk and let the kernel evict it from the page cache."""
+    if not hasattr(os, "posix_fadvise"):
+        return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        # DONTNEED skips pages that are still dirty, so write them back first
+        os.fdatasync(fd)
+        _fadvise(fd, "POSIX_FADV_DONTNEED")
+    finally:
+        os.close(fd)
+
+
+@contextmanager
+def _compress_pipe(path: str, command: list[str]):
+    """Yield a writable pipe into ``command``, whose stdout is written to ``path``."""
+    with open(path, "wb") as out:
+        proc = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=out, bufsize=_BUFFER_SIZE)
+        try:
+            yield proc.stdin
+        finally:
+            proc.stdin.close()
+            returncode = proc.wait()
+    if returncode:
+        raise AirflowException(f"{command[0]} exited with status {returncode}")
+
+
+@contextmanager
+def _decompress_pipe(path: str, command: list[str]):
+    """Yield a readable pipe carrying the output of ``command`` run on ``path``."""
+    proc = subprocess.Popen([*command, path], stdout=subprocess.PIPE, bufsize=_BUFFER_SIZE)
+    try:
+        yield proc.stdout
+    except BaseException:
+        proc.kill()
+        raise
+    finally:
+        proc.stdout.close()
+        returncode = proc.wait()
+    if returncode:
+        raise AirflowException(f"{command[0]} exited with status {returncode}")
+
+
+@contextmanager
+def _open_gzip(path: str):
+    """Read a gzip file, decompressing with ISA-L in a worker thread when ``isal`` is installed."""
+    with open(path, "rb") as raw:
+        _fadvise(raw.fileno(), "POSIX_FADV_SEQUENTIAL", "POSIX_FADV_WILLNEED")
+        try:
+            from isal import igzip_threaded
+        except ImportError:
+            reader = io.BufferedReader(gzip.GzipFile(fileobj=raw), _BUFFER_SIZE)
+        else:
+            reader = igzip_threaded.open(raw, "rb", block_size=_BUFFER_SIZE)
+        with reader:
+            yield reader
+
+
+@contextmanager
+def _open_zstd(path: str):
+    """Read a zstd file with ``zstandard`` if installed, else through the ``zstd`` executable."""
+    try:
+        import zstandard
+    except ImportError:
+        with _decompress_pipe(path, [_which("zstd"), "-dc"]) as reader:
+            yield reader
+        return
+    with open(path, "rb") as raw:
+        _fadvise(raw.fileno(), "POSIX_FADV_SEQUENTIAL", "POSIX_FADV_WILLNEED")
+        # BufferedReader adds the readline() used to skip the header
+        stream = zstandard.ZstdDecompressor().stream_reader(raw, closefd=False)
+        with io.BufferedReader(stream, _BUFFER_SIZE) as reader:
+            yield reader
+
+
+@contextmanager
+def _mmap_file(path: str):
+    """Yield a read-only, sequentially-advised memory map of ``path``."""
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        if hasattr(mmap, "MADV_SEQUENTIAL"):
+            mm.madvise(mmap.MADV_SEQUENTIAL)
+        yield mm
+
+
+def _split_lines(mm: mmap.mmap, start: int, parts: int) -> list[tuple[int, int]]:
+    """Split ``mm[start:]`` into up to ``parts`` byte ranges that end on line breaks."""
+    end = len(mm)
+    bounds = [start]
+    for i in range(1, parts):
+        target = start + (end - start) * i // parts
+        cut = mm.rfind(b"\n", bounds[-1], target) + 1
+        if cut > bounds[-1]:
+            bounds.append(cut)
+    bounds.append(end)
+    return [(a, b) for a, b in zip(bounds, bounds[1:]) if b > a]
+
+
+class _MmapRange:
+    """Minimal file-like reader over ``mm[start:end]``, enough for COPY FROM STDIN."""
+
+    def __init__(self, mm: mmap.mmap, start: int, end: int):
+        self._mm = mm
+        self._pos = start
+        self._end = end
+
+    def read(self, size: int = -1) -> bytes:
+        end = self._end if size < 0 else min(self._pos + size, self._end)
+        data = self._mm[self._pos : end]
+        self._pos = end
+        return data
 
 
 class PostgresToCsvOperator(BaseOperator):
     """
     Execute a SQL query on PostgreSQL and save the result as a CSV file.
 
-    Uses ``COPY (...) TO STDOUT WITH CSV`` for high-performance bulk export.
+    Uses ``COPY (...) TO STDOUT WITH (FORMAT CSV)`` for high-performance bulk export.
+    CSV files are written in UTF-8 regardless of the server or client encoding.
 
     :param conn_id: Airflow connection ID for the PostgreSQL database.
     :param csv_file_path: Local file path where the CSV will be saved.
@@ -25,9 +281,19 @@ class PostgresToCsvOperator(BaseOperator):
         - Absolute path to a ``.sql`` file (e.g., ``"/opt/sql/query.sql"``),
           loaded directly as a fallback
 
-    :param parameters: Parameters passed to the SQL query via ``cursor.mogrify``.
+    :param parameters: Parameters bound into the SQL query client-side, with
+        ``cursor.mogrify`` (or a ``psycopg.ClientCursor`` under psycopg 3).
+        Without parameters the query is used as-is, so literal ``%`` signs need no
+        escaping.
     :param has_header: Include a CSV header row. Defaults to ``True``.
-    :param compression: Compression format. Supports ``"gzip"``.
+        Ignored for the binary format.
+    :param format: COPY file format, ``"csv"`` or ``"binary"``. Binary skips text
+        conversion of every value, but the file can only be loaded back into
+        PostgreSQL with matching column types (and is not guaranteed portable
+        across PostgreSQL major versions). Defaults to ``"csv"``.
+    :param compression: Compression format. Supports ``"gzip"`` and ``"zstd"``.
+        Gzip output is produced by ``pigz`` when it is on ``PATH`` (falling back to
+        Python's ``gzip`` module); zstd output requires the ``zstd`` executable.
         Defaults to ``None`` (no compression).
     :param timeout: Query timeout in minutes. Defaults to ``60``.
     """
@@ -45,6 +311,7 @@ class PostgresToCsvOperator(BaseOperator):
         sql: str,
         parameters: dict | None = None,
         has_header: bool = True,
+        format: str = "csv",
         compression: str | None = None,
         timeout: int = 60,
         **kwargs,
@@ -55,36 +322,54 @@ class PostgresToCsvOperator(BaseOperator):
         self.sql = sql
         self.parameters = parameters or {}
         self.has_header = has_header
+        self.format = format
         self.compression = compression
         self.timeout = timeout
 
     def execute(self, context):
+        if self.format not in _FORMATS:
+            raise AirflowException(f"Unsupported COPY format: {self.format}")
+
         sql = self.sql
         # Airflow's templating loads .sql files from template search paths.
         # For absolute paths not in search paths, load manually as fallback.
         if sql.endswith(".sql"):
-            with open(sql, encoding="utf-8") as f:
-                sql = f.read()
+            # Read raw bytes and decode once, skipping the TextIOWrapper codec layer.
+            with open(sql, "rb") as f:
+                sql = f.read().decode("utf-8")
 
-        pg_hook = PostgresHook(postgres_conn_id=self.conn_id)
-        cleaned_sql = sql.strip().rstrip(";")
+        # One pass and one copy, even for multi-MB rendered queries
+        cleaned_sql = sql.rstrip(_SQL_TRAILERS)
 
         self.log.info("Running query and saving to CSV: %s", self.csv_file_path)
 
-        with pg_hook.get_conn() as conn:
+        with _connect(self.conn_id) as conn:
             with conn.cursor() as cursor:
-                cursor.execute("SET statement_timeout = %s;", (self.timeout * 60 * 1000,))
-                formatted_sql = cursor.mogrify(cleaned_sql, self.parameters).decode("utf-8")
-
-                header_clause = " HEADER" if self.has_header else ""
-                copy_command = f"COPY ({formatted_sql}) TO STDOUT WITH CSV{header_clause}"
+                _begin(cursor, self.timeout)
+                if self.parameters:
+                    formatted_sql = _mogrify(cursor, cleaned_sql, self.parameters)
+                else:
+                    formatted_sql = cleaned_sql
+
+                if self.format == "binary":
+                    copy_command = f"COPY ({formatted_sql}) TO STDOUT WITH (FORMAT BINARY)"
+                else:
+                    # The file is written as bytes, so the server encodes the rows as UTF-8
+                    header_clause = ", HEADER" if self.has_header else ""
+                    copy_command = (
+                        f"COPY ({formatted_sql}) TO STDOUT "
+                        f"WITH (FORMAT CSV{header_clause}, ENCODING 'UTF8')"
+                    )
 
                 rows = 0
-                open_func = self._get_open_func()
-                with open_func(self.csv_file_path, "wt", encoding="utf-8") as csv_file:
-                    cursor.copy_expert(copy_command, csv_file)
+                with self._open_csv() as csv_file:
+                    _copy_to(cursor, copy_command, csv_file)
                     rows = cursor.rowcount
 
+        # Flushed only after the transaction has ended, so the connection and its
+        # snapshot are not held open while a large file is written back to disk
+        _drop_page_cache(self.csv_file_path)
+
         self.log.info(
             "CSV saved: %s (%s rows, %s)",
             self.csv_file_path,
@@ -93,16 +378,30 @@ class PostgresToCsvOperator(BaseOperator):
         )
         return self.csv_file_path
 
-    def _get_open_func(self):
-        """Return the appropriate file open function based on compression setting."""
-        return gzip.open if self.compression == "gzip" else open
+    def _open_csv(self):
+        """
+        Open the output file for writing based on compression setting.
+
+        The file is binary: ``copy_expert`` writes the bytes it receives from libpq
+        as-is, without a text codec in between.
+        """
+        if self.compression == "gzip":
+            # pigz compresses on all cores; gzip.open is limited to one.
+            pigz = shutil.which("pigz")
+            if pigz:
+                return _compress_pipe(self.csv_file_path, [pigz, "-c"])
+            return io.BufferedWriter(gzip.open(self.csv_file_path, "wb"), _BUFFER_SIZE)
+        if self.compression == "zstd":
+            return _compress_pipe(self.csv_file_path, [_which("zstd"), "-T0", "-3", "-c"])
+        return open(self.csv_file_path, "wb", buffering=_BUFFER_SIZE)
 
 
 class CsvToPostgresOperator(BaseOperator):
     """
     Load a CSV file into a PostgreSQL table.
 
-    Uses ``COPY ... FROM STDIN WITH CSV`` for high-performance bulk import.
+    Uses ``COPY ... FROM STDIN WITH (FORMAT CSV)`` for high-performance bulk import.
+    CSV files are read as UTF-8 regardless of the server or client encoding.
 
     :param conn_id: Airflow connection ID for the PostgreSQL database.
     :param table_name: Target table (may include schema, e.g. ``"myschema.mytable"``).
@@ -114,9 +413,27 @@ class CsvToPostgresOperator(BaseOperator):
     :param columns: Explicit column list. If provided, maps CSV columns to these
         table columns and skips the file header (if present).
     :param truncate: Truncate the table before loading. Defaults to ``False``.
-    :param compression: Compression format. Supports ``"gzip"``.
+        The TRUNCATE and the COPY run in one transaction, so a failed load leaves the
+        table untouched. An empty (zero-byte) file is skipped without connecting,
+        unless ``truncate`` is set, in which case the table is still truncated.
+    :param restart_identity: With ``truncate``, also reset sequences owned by the
+        table's columns (``TRUNCATE ... RESTART IDENTITY``). Setting it without
+        ``truncate`` raises an error. Defaults to ``False``.
+    :param format: COPY file format, ``"csv"`` or ``"binary"`` (as written by
+        ``PostgresToCsvOperator(format="binary")``). The CSV options
+        (``delimiter``, ``quote_char``, ``null_string``, ``has_header``) do not
+        apply to binary files. Defaults to ``"csv"``.
+    :param compression: Compression format. Supports ``"gzip"`` and ``"zstd"``.
+        Decompression uses the ``isal`` and ``zstandard`` packages when installed,
+        falling back to Python's ``gzip`` module and the ``zstd`` executable.
         Defaults to ``None`` (no compression).
     :param timeout: Query timeout in minutes. Defaults to ``60``.
+    :param parallel: Number of concurrent connections to load the file with. The file
+        is split on line breaks, so quoted values must not contain newlines. Only
+        applies to uncompressed CSV files without ``truncate``; otherwise a single
+        COPY is used. The connections commit one after another once all slices have
+        loaded, so if a commit fails, the slices committed before it stay loaded.
+        Defaults to ``1``.
     """
 
     template_fields: Sequence[str] = ("csv_file_path", "table_name")
@@ -132,8 +449,11 @@ class CsvToPostgresOperator(BaseOperator):
         has_header: bool = True,
         columns: list[str] | None = None,
         truncate: bool = False,
+        restart_identity: bool = False,
+        format: str = "csv",
         compression: str | None = None,
         timeout: int = 60,
+        parallel: int = 1,
         **kwargs,
     ):
         super().__init__(**kwargs)
@@ -146,42 +466,52 @@ class CsvToPostgresOperator(BaseOperator):
         self.has_header = has_header
         self.columns = columns
         self.truncate = truncate
+        self.restart_identity = restart_identity
+        self.format = format
         self.compression = compression
         self.timeout = timeout
+        self.parallel = parallel
 
     def execute(self, context):
-        if not os.path.exists(self.csv_file_path):
-            raise AirflowException(f"CSV file not found: {self.csv_file_path}")
-
-        pg_hook = PostgresHook(postgres_conn_id=self.conn_id)
+        if self.format not in _FORMATS:
+            raise AirflowException(f"Unsupported COPY format: {self.format}")
+        if self.restart_identity and not self.truncate:
+            raise AirflowException("restart_identity requires truncate=True")
+        try:
+            file_size = os.stat(self.csv_file_path).st_size
+        except FileNotFoundError:
+            raise AirflowException(f"CSV file not found: {self.csv_file_path}") from None
+        if file_size == 0 and not self.truncate:
+            self.log.warning("CSV file %s is empty, nothing to load", self.csv_file_path)
+            return 0
 
         self.log.info("Loading %s into %s", self.csv_file_path, self.table_name)
 
-        column_clause = self._build_column_clause()
-        header_clause = "HEADER" if self.has_header and not self.columns else ""
-
-        copy_command = (
-            f"COPY {self._quote_table_name()} {column_clause} "
-            f"FROM STDIN WITH CSV "
-            f"DELIMITER '{self.delimiter}' "
-            f"QUOTE '{self.quote_char}' "
-            f"NULL '{self.null_string}' "
-            f"{header_clause}"
-        )
-
-        with pg_hook.get_conn() as conn:
-            with conn.cursor() as cursor:
-                cursor.execute("SET statement_timeout = %s;", (self.timeout * 60 * 1000,))
-                if self.truncate:
-                    self.log.info("Truncating table %s", self.table_name)
-                    cursor.execute(f"TRUNCATE {self._quote_table_name()}")
-                open_func = self._get_open_func()
-                with open_func(self.csv_file_path, "rt", encoding="utf-8") as csv_file:
-                    if self.columns and self.has_header:
-                        next(csv_file)
-                    cursor.copy_expert(copy_command, csv_file)
-                rows = cursor.rowcount
-            conn.commit()
+        workers = self._parallel_workers()
+        if workers > 1:
+            rows = self._load_parallel(workers)
+        else:
+            with _connect(self.conn_id) as conn:
+                with conn.cursor() as cursor:
+                    statements = []
+                    if self.truncate:
+                        self.log.info("Truncating table %s", self.table_name)
+                        sql = _sql_module(cursor)
+                        table = sql.Identifier(*self.table_name.split("."))
+                        truncate = sql.SQL("TRUNCATE {}").format(table)
+                        if self.restart_identity:
+                            truncate += sql.SQL(" RESTART IDENTITY")
+                        statements.append(truncate)
+                    # The timeout and TRUNCATE go to the server in a single batch
+                    _begin(cursor, self.timeout, *statements)
+                    copy_command = self._copy_command(
+                        cursor, header=self.has_header and not self.columns
+                    )
+                    with self._open_csv(file_size) as csv_file:
+                        if self.columns and self.has_header and self.format == "csv":
+                            csv_file.readline()
+                        _copy_from(cursor, copy_command, csv_file)
+                    rows = cursor.rowcount
 
         self.log.info(
             "Loaded %s rows from %s into %s",
@@ -191,22 +521,73 @@ class CsvToPostgresOperator(BaseOperator):
         )
         return rows
 
-    @staticmethod
-    def _quote_identifier(name: str) -> str:
-        """Quote a SQL identifier, escaping any double quotes."""
-        escaped = name.replace('"', '""')
-        return f'"{escaped}"'
-
-    def _quote_table_name(self) -> str:
-        parts = self.table_name.split(".")
-        return ".".join(self._quote_identifier(p) for p in parts)
-
-    def _build_column_clause(self) -> str:
-        if not self.columns:
-            return ""
-        cols = ", ".join(self._quote_identifier(c) for c in self.columns)
-        return f"({cols})"
-
-    def _get_open_func(self):
-        """Return the appropriate file open function based on compression setting."""
-        return gzip.open if self.compression == "gzip" else open
+    def _parallel_workers(self) -> int:
+        """Return how many concurrent COPY connections this load can use."""
+        if self.parallel <= 1:
+            return 1
+        if self.compression or self.format != "csv" or self.truncate:
+            self.log.warning(
+                "parallel=%s requires an uncompressed CSV file and truncate=False; "
+                "loading with a single COPY",
+                self.parallel,
+            )
+            return 1
+        return self.parallel
+
+    def _load_parallel(self, workers: int) -> int:
+        """Load line-aligned slices of the file over ``workers`` concurrent connections."""
+        with _mmap_file(self.csv_file_path) as mm, ExitStack() as stack:
+            start = 0
+            if self.has_header:
+                newline = mm.find(b"\n")
+                start = len(mm) if newline < 0 else newline + 1
+            ranges = _split_lines(mm, start, workers)
+            if not ranges:
+                return 0
+
+            # Connections are entered on the stack, so none commits until every slice
+            # has loaded and all roll back if a load fails. The commits themselves run
+            # one at a time, though: if one fails, those before it are kept.
+            conns = [stack.enter_context(_connect(self.conn_id)) for _ in ranges]
+
+            def load(conn, byte_range: tuple[int, int]) -> int:
+                with conn.cursor() as cursor:
+                    _begin(cursor, self.timeout)
+                    # The header, if any, was skipped before splitting the file
+                    copy_command = self._copy_command(cursor, header=False)
+                    _copy_from(cursor, copy_command, _MmapRange(mm, *byte_range))
+                    return cursor.rowcount
+
+            self.log.info("Loading %s slices in parallel", len(ranges))
+            with ThreadPoolExecutor(max_workers=len(ranges)) as executor:
+                return sum(executor.map(load, conns, ranges))
+
+    def _copy_command(self, cursor, header: bool):
+        """Return the (cached) COPY statement for this load, composed for ``cursor``."""
+        return _copy_from_command(
+            _sql_module(cursor),
+            self.table_name,
+            tuple(self.columns or ()),
+            self.format,
+            self.delimiter,
+            self.quote_char,
+            self.null_string,
+            header,
+        )
+
+    def _open_csv(self, file_size: int):
+        """
+        Open the input file for reading (in binary mode) based on compression setting.
+
+        Large uncompressed files are memory-mapped, which saves the copy through a
+        read buffer; ``mmap`` provides the ``read``/``readline`` that COPY needs.
+        """
+        if self.compression == "gzip":
+            return _open_gzip(self.csv_file_path)
+        if self.compression == "zstd":
+            return _open_zstd(self.csv_file_path)
+        if file_size > _MMAP_THRESHOLD:
+            return _mmap_file(self.csv_file_path)
+        csv_file = open(self.csv_file_path, "rb", buffering=_BUFFER_SIZE)
+        _fadvise(csv_file.fileno(), "POSIX_FADV_SEQUENTIAL", "POSIX_FADV_WILLNEED")
+        return csv_file
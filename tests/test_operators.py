@@ -1,14 +1,38 @@
 """Tests for PostgresToCsvOperator and CsvToPostgresOperator."""
 
 import gzip
+import os
+import shutil
+import subprocess
+import sys
 from unittest.mock import MagicMock, patch
 
 import pytest
 from airflow.exceptions import AirflowException
+from psycopg import sql as psycopg_sql
+from psycopg2 import sql as psycopg2_sql
 
 from airflow_postgres_csv.operators import CsvToPostgresOperator, PostgresToCsvOperator
 
 
+def render_sql(statement) -> str:
+    """Render a statement passed to the mocked cursor as SQL text, quoted by psycopg 3."""
+    if isinstance(statement, str):
+        return statement
+
+    # psycopg2 can only quote against a live connection, so convert to psycopg 3
+    def convert(obj):
+        if isinstance(obj, psycopg2_sql.Composed):
+            return psycopg_sql.Composed([convert(part) for part in obj.seq])
+        if isinstance(obj, psycopg2_sql.Identifier):
+            return psycopg_sql.Identifier(*obj.strings)
+        if isinstance(obj, psycopg2_sql.Literal):
+            return psycopg_sql.Literal(obj.wrapped)
+        return psycopg_sql.SQL(obj.string)
+
+    return convert(statement).as_string()
+
+
 @pytest.fixture
 def mock_pg_hook():
     with patch("airflow_postgres_csv.operators.PostgresHook") as mock_hook_cls:
@@ -19,10 +43,7 @@ def mock_pg_hook():
 
         mock_conn.cursor.return_value.__enter__ = MagicMock(return_value=mock_cursor)
         mock_conn.cursor.return_value.__exit__ = MagicMock(return_value=False)
-        mock_hook_cls.return_value.get_conn.return_value.__enter__ = MagicMock(
-            return_value=mock_conn
-        )
-        mock_hook_cls.return_value.get_conn.return_value.__exit__ = MagicMock(return_value=False)
+        mock_hook_cls.return_value.get_conn.return_value = mock_conn
 
         yield {
             "hook_cls": mock_hook_cls,
@@ -43,6 +64,10 @@ class TestPostgresToCsvOperator:
         result = op.execute(context={})
         assert result == csv_path
         mock_pg_hook["cursor"].copy_expert.assert_called_once()
+        copy_call = mock_pg_hook["cursor"].copy_expert.call_args[0][0]
+        assert copy_call == (
+            "COPY (SELECT * FROM users) TO STDOUT WITH (FORMAT CSV, HEADER, ENCODING 'UTF8')"
+        )
 
     def test_reads_sql_from_file(self, mock_pg_hook, tmp_path):
         """Test absolute path fallback when Airflow templating doesn't load the file."""
@@ -57,9 +82,9 @@ class TestPostgresToCsvOperator:
             sql=str(sql_file),  # Absolute path
         )
         op.execute(context={})
-        # Verify the file content was loaded and passed to mogrify
-        call_args = mock_pg_hook["cursor"].mogrify.call_args[0][0]
-        assert "fallback_table" in call_args
+        # Verify the file content was loaded into the COPY command
+        copy_call = mock_pg_hook["cursor"].copy_expert.call_args[0][0]
+        assert "fallback_table" in copy_call
 
     def test_strips_trailing_semicolon(self, mock_pg_hook, tmp_path):
         csv_path = str(tmp_path / "out.csv")
@@ -70,8 +95,32 @@ class TestPostgresToCsvOperator:
             sql="SELECT 1;  ",
         )
         op.execute(context={})
-        call_args = mock_pg_hook["cursor"].mogrify.call_args
-        assert not call_args[0][0].endswith(";")
+        copy_call = mock_pg_hook["cursor"].copy_expert.call_args[0][0]
+        assert copy_call.startswith("COPY (SELECT 1) ")
+
+    def test_strips_trailing_semicolons_and_whitespace(self, mock_pg_hook, tmp_path):
+        op = PostgresToCsvOperator(
+            task_id="test",
+            conn_id="test_conn",
+            csv_file_path=str(tmp_path / "out.csv"),
+            sql="SELECT ';'\n;\n ;\t\n",
+        )
+        op.execute(context={})
+        copy_call = mock_pg_hook["cursor"].copy_expert.call_args[0][0]
+        assert copy_call.startswith("COPY (SELECT ';') ")
+
+    def test_mogrifies_only_with_parameters(self, mock_pg_hook, tmp_path):
+        cursor = mock_pg_hook["cursor"]
+        sql = "SELECT * FROM users WHERE active = %(active)s"
+        for parameters in (None, {"active": True}):
+            PostgresToCsvOperator(
+                task_id="test",
+                conn_id="test_conn",
+                csv_file_path=str(tmp_path / "out.csv"),
+                sql=sql,
+                parameters=parameters,
+            ).execute(context={})
+        cursor.mogrify.assert_called_once_with(sql, {"active": True})
 
     def test_no_header(self, mock_pg_hook, tmp_path):
         csv_path = str(tmp_path / "out.csv")
@@ -101,6 +150,113 @@ class TestPostgresToCsvOperator:
         with gzip.open(csv_path, "rt") as f:
             f.read()  # Should not raise
 
+    def test_looks_up_connection_per_execution(self, mock_pg_hook, tmp_path):
+        for name in ("a.csv", "b.csv"):
+            PostgresToCsvOperator(
+                task_id=f"test_{name}",
+                conn_id="test_conn",
+                csv_file_path=str(tmp_path / name),
+                sql="SELECT 1",
+            ).execute(context={})
+        # Connections pick up rotated credentials on every run
+        assert mock_pg_hook["hook_cls"].call_count == 2
+
+    @pytest.mark.skipif(not hasattr(os, "posix_fadvise"), reason="posix_fadvise not available")
+    def test_flushes_before_dropping_page_cache(self, mock_pg_hook, tmp_path):
+        calls = []
+        mock_pg_hook["conn"].close.side_effect = lambda: calls.append("close")
+        op = PostgresToCsvOperator(
+            task_id="test",
+            conn_id="test_conn",
+            csv_file_path=str(tmp_path / "out.csv"),
+            sql="SELECT 1",
+        )
+        with (
+            patch("os.fdatasync", side_effect=lambda fd: calls.append("fdatasync")),
+            patch("os.posix_fadvise", side_effect=lambda *args: calls.append("fadvise")),
+        ):
+            op.execute(context={})
+        # Dirty pages are not evicted, so they are written back first, after the
+        # transaction has ended and the connection is closed
+        assert calls == ["close", "fdatasync", "fadvise"]
+
+    def test_binary_format(self, mock_pg_hook, tmp_path):
+        csv_path = str(tmp_path / "out.bin")
+        op = PostgresToCsvOperator(
+            task_id="test",
+            conn_id="test_conn",
+            csv_file_path=csv_path,
+            sql="SELECT 1",
+            format="binary",
+        )
+        op.execute(context={})
+        copy_call = mock_pg_hook["cursor"].copy_expert.call_args[0][0]
+        assert copy_call == "COPY (SELECT 1) TO STDOUT WITH (FORMAT BINARY)"
+
+    def test_rejects_unknown_format(self, mock_pg_hook, tmp_path):
+        op = PostgresToCsvOperator(
+            task_id="test",
+            conn_id="test_conn",
+            csv_file_path=str(tmp_path / "out.csv"),
+            sql="SELECT 1",
+            format="parquet",
+        )
+        with pytest.raises(AirflowException, match="Unsupported COPY format"):
+            op.execute(context={})
+
+    @pytest.mark.skipif(shutil.which("zstd") is None, reason="zstd executable not available")
+    def test_zstd_compression(self, mock_pg_hook, tmp_path):
+        csv_path = str(tmp_path / "out.csv.zst")
+        mock_pg_hook["cursor"].copy_expert.side_effect = lambda cmd, f: f.write(b"a,b\n1,2\n")
+        op = PostgresToCsvOperator(
+            task_id="test",
+            conn_id="test_conn",
+            csv_file_path=csv_path,
+            sql="SELECT 1",
+            compression="zstd",
+        )
+        op.execute(context={})
+        output = subprocess.run(["zstd", "-dc", csv_path], capture_output=True, check=True)
+        assert output.stdout == b"a,b\n1,2\n"
+
+    def test_psycopg3_copy(self, mock_pg_hook, tmp_path):
+        csv_path = tmp_path / "out.csv"
+        cursor = mock_pg_hook["cursor"]
+        del cursor.copy_expert  # psycopg 3 cursors only provide copy()
+        copy = cursor.copy.return_value.__enter__.return_value
+        copy.__iter__.return_value = iter([b"a,b\n", b"1,2\n"])
+
+        op = PostgresToCsvOperator(
+            task_id="test",
+            conn_id="test_conn",
+            csv_file_path=str(csv_path),
+            sql="SELECT 1",
+        )
+        op.execute(context={})
+        assert "COPY (SELECT 1) TO STDOUT" in cursor.copy.call_args[0][0]
+        assert csv_path.read_bytes() == b"a,b\n1,2\n"
+
+    def test_psycopg3_mogrifies_with_client_cursor(self, mock_pg_hook, tmp_path):
+        cursor = mock_pg_hook["cursor"]
+        del cursor.copy_expert
+        sql = "SELECT * FROM users WHERE active = %(active)s"
+
+        with patch("psycopg.ClientCursor") as client_cursor_cls:
+            client_cursor = client_cursor_cls.return_value.__enter__.return_value
+            client_cursor.mogrify.return_value = "SELECT * FROM users WHERE active = true"
+            PostgresToCsvOperator(
+                task_id="test",
+                conn_id="test_conn",
+                csv_file_path=str(tmp_path / "out.csv"),
+                sql=sql,
+                parameters={"active": True},
+            ).execute(context={})
+        # psycopg 3 cursors bind server-side and have no mogrify of their own
+        client_cursor_cls.assert_called_once_with(cursor.connection)
+        client_cursor.mogrify.assert_called_once_with(sql, {"active": True})
+        copy_call = cursor.copy.call_args[0][0]
+        assert copy_call.startswith("COPY (SELECT * FROM users WHERE active = true) TO STDOUT")
+
 
 class TestCsvToPostgresOperator:
     def test_raises_when_file_missing(self, mock_pg_hook):
@@ -113,6 +269,19 @@ class TestCsvToPostgresOperator:
         with pytest.raises(AirflowException, match="CSV file not found"):
             op.execute(context={})
 
+    def test_skips_empty_file(self, mock_pg_hook, tmp_path):
+        csv_file = tmp_path / "data.csv"
+        csv_file.touch()
+
+        op = CsvToPostgresOperator(
+            task_id="test",
+            conn_id="test_conn",
+            table_name="my_table",
+            csv_file_path=str(csv_file),
+        )
+        assert op.execute(context={}) == 0
+        mock_pg_hook["hook_cls"].return_value.get_conn.assert_not_called()
+
     def test_loads_csv(self, mock_pg_hook, tmp_path):
         csv_file = tmp_path / "data.csv"
         csv_file.write_text("a,b\n1,2\n")
@@ -139,10 +308,12 @@ class TestCsvToPostgresOperator:
             csv_file_path=str(csv_file),
         )
         op.execute(context={})
-        copy_call = mock_pg_hook["cursor"].copy_expert.call_args[0][0]
-        # Should contain quoted identifiers
-        assert "staging" in copy_call
-        assert "my_table" in copy_call
+        copy_call = render_sql(mock_pg_hook["cursor"].copy_expert.call_args[0][0])
+        # Should be composed as a schema-qualified identifier
+        assert copy_call == (
+            'COPY "staging"."my_table" FROM STDIN WITH '
+            "(FORMAT CSV, DELIMITER ',', QUOTE '\"', NULL '', ENCODING 'UTF8', HEADER)"
+        )
 
     def test_explicit_columns(self, mock_pg_hook, tmp_path):
         csv_file = tmp_path / "data.csv"
@@ -156,12 +327,104 @@ class TestCsvToPostgresOperator:
             columns=["col_a", "col_b"],
         )
         op.execute(context={})
-        copy_call = mock_pg_hook["cursor"].copy_expert.call_args[0][0]
-        assert "col_a" in copy_call
-        assert "col_b" in copy_call
+        copy_call = render_sql(mock_pg_hook["cursor"].copy_expert.call_args[0][0])
+        assert copy_call.startswith('COPY "my_table" ("col_a", "col_b") FROM STDIN')
         # Should NOT have HEADER since columns are explicit
         assert "HEADER" not in copy_call
 
+    def test_memory_maps_large_file(self, mock_pg_hook, tmp_path):
+        csv_file = tmp_path / "data.csv"
+        csv_file.write_text("col_a,col_b\n1,2\n")
+
+        loaded = []
+        mock_pg_hook["cursor"].copy_expert.side_effect = lambda cmd, f: loaded.append(f.read())
+        op = CsvToPostgresOperator(
+            task_id="test",
+            conn_id="test_conn",
+            table_name="my_table",
+            csv_file_path=str(csv_file),
+            columns=["col_a", "col_b"],
+        )
+        with patch("airflow_postgres_csv.operators._MMAP_THRESHOLD", 0):
+            op.execute(context={})
+        # Header line skipped, data rows passed through the memory map
+        assert loaded == [b"1,2\n"]
+
+    def test_parallel_load(self, mock_pg_hook, tmp_path):
+        csv_file = tmp_path / "data.csv"
+        csv_file.write_text("a,b\n1,2\n3,4\n5,6\n7,8\n")
+
+        loaded = []
+        mock_pg_hook["cursor"].copy_expert.side_effect = lambda cmd, f: loaded.append(f.read())
+        op = CsvToPostgresOperator(
+            task_id="test",
+            conn_id="test_conn",
+            table_name="my_table",
+            csv_file_path=str(csv_file),
+            parallel=2,
+        )
+        result = op.execute(context={})
+        assert result == 84  # mocked rowcount per slice
+        assert sorted(loaded) == [b"1,2\n3,4\n", b"5,6\n7,8\n"]
+        # Header is skipped before splitting, not by COPY
+        copy_call = render_sql(mock_pg_hook["cursor"].copy_expert.call_args[0][0])
+        assert "HEADER" not in copy_call
+
+    def test_parallel_falls_back_with_truncate(self, mock_pg_hook, tmp_path):
+        csv_file = tmp_path / "data.csv"
+        csv_file.write_text("a,b\n1,2\n3,4\n")
+
+        op = CsvToPostgresOperator(
+            task_id="test",
+            conn_id="test_conn",
+            table_name="my_table",
+            csv_file_path=str(csv_file),
+            truncate=True,
+            parallel=2,
+        )
+        op.execute(context={})
+        mock_pg_hook["cursor"].copy_expert.assert_called_once()
+
+    def test_binary_format(self, mock_pg_hook, tmp_path):
+        data_file = tmp_path / "data.bin"
+        data_file.write_bytes(b"PGCOPY\n\xff\r\n\x00")
+
+        loaded = []
+        mock_pg_hook["cursor"].copy_expert.side_effect = lambda cmd, f: loaded.append(f.read())
+        op = CsvToPostgresOperator(
+            task_id="test",
+            conn_id="test_conn",
+            table_name="my_table",
+            csv_file_path=str(data_file),
+            columns=["col_a", "col_b"],
+            format="binary",
+        )
+        op.execute(context={})
+        copy_call = render_sql(mock_pg_hook["cursor"].copy_expert.call_args[0][0])
+        assert copy_call == 'COPY "my_table" ("col_a", "col_b") FROM STDIN WITH (FORMAT BINARY)'
+        # No header line is skipped for binary files
+        assert loaded == [b"PGCOPY\n\xff\r\n\x00"]
+
+    def test_csv_options_are_literals(self, mock_pg_hook, tmp_path):
+        csv_file = tmp_path / "data.csv"
+        csv_file.write_text("a;b\n1;2\n")
+
+        op = CsvToPostgresOperator(
+            task_id="test",
+            conn_id="test_conn",
+            table_name="my_table",
+            csv_file_path=str(csv_file),
+            delimiter=";",
+            quote_char="'",
+            null_string="\\N",
+        )
+        op.execute(context={})
+        copy_call = render_sql(mock_pg_hook["cursor"].copy_expert.call_args[0][0])
+        # Escaped by the driver rather than interpolated into the statement
+        assert "DELIMITER ';'" in copy_call
+        assert "QUOTE ''''" in copy_call
+        assert "E'\\\\N'" in copy_call
+
     def test_truncate_before_load(self, mock_pg_hook, tmp_path):
         csv_file = tmp_path / "data.csv"
         csv_file.write_text("a,b\n1,2\n")
@@ -179,6 +442,62 @@ class TestCsvToPostgresOperator:
         truncate_called = any("TRUNCATE" in str(call) for call in execute_calls)
         assert truncate_called
 
+    def test_timeout_and_truncate_batched(self, mock_pg_hook, tmp_path):
+        csv_file = tmp_path / "data.csv"
+        csv_file.write_text("a,b\n1,2\n")
+
+        op = CsvToPostgresOperator(
+            task_id="test",
+            conn_id="test_conn",
+            table_name="my_table",
+            csv_file_path=str(csv_file),
+            truncate=True,
+            timeout=5,
+        )
+        op.execute(context={})
+        # SET LOCAL and TRUNCATE share one round trip, followed by a single commit
+        mock_pg_hook["cursor"].execute.assert_called_once()
+        batch = render_sql(mock_pg_hook["cursor"].execute.call_args[0][0])
+        assert batch == 'SET LOCAL statement_timeout = 300000; TRUNCATE "my_table"'
+        mock_pg_hook["conn"].commit.assert_called_once()
+        mock_pg_hook["conn"].close.assert_called_once()
+
+    def test_truncate_restart_identity(self, mock_pg_hook, tmp_path):
+        csv_file = tmp_path / "data.csv"
+        csv_file.write_text("a,b\n1,2\n")
+
+        op = CsvToPostgresOperator(
+            task_id="test",
+            conn_id="test_conn",
+            table_name="my_table",
+            csv_file_path=str(csv_file),
+            truncate=True,
+            restart_identity=True,
+        )
+        op.execute(context={})
+        batch = render_sql(mock_pg_hook["cursor"].execute.call_args[0][0])
+        assert batch.endswith('; TRUNCATE "my_table" RESTART IDENTITY')
+        # TRUNCATE and COPY are committed together, after the load
+        conn = mock_pg_hook["conn"]
+        calls = [name for name, _, _ in conn.mock_calls if name in ("commit", "cursor")]
+        assert calls == ["cursor", "commit"]
+        mock_pg_hook["cursor"].copy_expert.assert_called_once()
+
+    def test_restart_identity_requires_truncate(self, mock_pg_hook, tmp_path):
+        csv_file = tmp_path / "data.csv"
+        csv_file.write_text("a,b\n1,2\n")
+
+        op = CsvToPostgresOperator(
+            task_id="test",
+            conn_id="test_conn",
+            table_name="my_table",
+            csv_file_path=str(csv_file),
+            restart_identity=True,
+        )
+        with pytest.raises(AirflowException, match="restart_identity requires truncate"):
+            op.execute(context={})
+        mock_pg_hook["hook_cls"].return_value.get_conn.assert_not_called()
+
     def test_gzip_compression(self, mock_pg_hook, tmp_path):
         csv_file = tmp_path / "data.csv.gz"
         with gzip.open(csv_file, "wt") as f:
@@ -194,3 +513,67 @@ class TestCsvToPostgresOperator:
         result = op.execute(context={})
         assert result == 42  # mocked rowcount
         mock_pg_hook["cursor"].copy_expert.assert_called_once()
+
+    @pytest.mark.skipif(shutil.which("zstd") is None, reason="zstd executable not available")
+    def test_zstd_compression(self, mock_pg_hook, tmp_path):
+        csv_file = tmp_path / "data.csv"
+        csv_file.write_text("a,b\n1,2\n")
+        subprocess.run(["zstd", "-q", "--rm", str(csv_file)], check=True)
+
+        loaded = []
+        mock_pg_hook["cursor"].copy_expert.side_effect = lambda cmd, f: loaded.append(f.read())
+        op = CsvToPostgresOperator(
+            task_id="test",
+            conn_id="test_conn",
+            table_name="my_table",
+            csv_file_path=str(tmp_path / "data.csv.zst"),
+            compression="zstd",
+        )
+        op.execute(context={})
+        assert loaded == [b"a,b\n1,2\n"]
+
+    def test_psycopg3_copy(self, mock_pg_hook, tmp_path):
+        csv_file = tmp_path / "data.csv"
+        csv_file.write_text("a,b\n1,2\n")
+        cursor = mock_pg_hook["cursor"]
+        del cursor.copy_expert  # psycopg 3 cursors only provide copy()
+
+        op = CsvToPostgresOperator(
+            task_id="test",
+            conn_id="test_conn",
+            table_name="my_table",
+            csv_file_path=str(csv_file),
+        )
+        result = op.execute(context={})
+        assert result == 42  # mocked rowcount
+        copy = cursor.copy.return_value.__enter__.return_value
+        copy.write.assert_called_once_with(b"a,b\n1,2\n")
+
+    @pytest.mark.parametrize("module", ["isal", "zstandard"])
+    def test_decompresses_without_optional_modules(self, mock_pg_hook, tmp_path, module):
+        compression = "gzip" if module == "isal" else "zstd"
+        if compression == "zstd" and shutil.which("zstd") is None:
+            pytest.skip("zstd executable not available")
+        csv_file = tmp_path / "data.csv"
+        csv_file.write_text("col_a,col_b\n1,2\n")
+        if compression == "gzip":
+            subprocess.run(["gzip", str(csv_file)], check=True)
+            csv_file = tmp_path / "data.csv.gz"
+        else:
+            subprocess.run(["zstd", "-q", "--rm", str(csv_file)], check=True)
+            csv_file = tmp_path / "data.csv.zst"
+
+        loaded = []
+        mock_pg_hook["cursor"].copy_expert.side_effect = lambda cmd, f: loaded.append(f.read())
+        op = CsvToPostgresOperator(
+            task_id="test",
+            conn_id="test_conn",
+            table_name="my_table",
+            csv_file_path=str(csv_file),
+            columns=["col_a", "col_b"],
+            compression=compression,
+        )
+        # Falls back to the gzip module / zstd executable
+        with patch.dict(sys.modules, {module: None}):
+            op.execute(context={})
+        assert loaded == [b"1,2\n"]